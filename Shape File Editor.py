@@ -5,29 +5,456 @@ Created on Sun Feg 01 18:26:58 2025
 @author: Bobby Azad
 """
 
+import functools
+import html
+import math
+import os
 import sys
-import geopandas as gpd
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+# geopandas, pandas, shapely, pyproj, pyogrio and contextily are imported
+# where they are first used, so a session that never opens a shapefile does
+# not pay for loading the geospatial stack.
+
+# numba compiles the statistics kernels; without it the statistics use shapely and numpy.
+try:
+    from numba import get_num_threads, njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 import matplotlib
 # Use the generic Qt backend that supports Qt6
 matplotlib.use("QtAgg")
 import matplotlib.pyplot as plt
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize, to_hex
 from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.path import Path
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
-# Import contextily to add a basemap layer
-import contextily as ctx
-
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QFileDialog, QTableWidget, QTableWidgetItem,
-    QVBoxLayout, QWidget, QPushButton, QMessageBox, QDialog, QDialogButtonBox,
+    QApplication, QMainWindow, QFileDialog, QTableView, QVBoxLayout, QWidget, QPushButton, QMessageBox, QDialog, QDialogButtonBox,
     QCheckBox, QRadioButton, QGroupBox, QLabel, QLineEdit, QHBoxLayout, QComboBox,
-    QInputDialog, QSlider, QGridLayout, QSizePolicy, QHeaderView, QAbstractItemView
+    QInputDialog, QSlider, QGridLayout, QSizePolicy, QHeaderView, QAbstractItemView,
+    QProgressDialog, QTextBrowser
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QAction, QTextDocument
+
+
+##############################################################################
+# Geometry helpers shared by the map viewer.
+##############################################################################
+# Below this many features a single chunk is faster than spinning up threads.
+_MIN_FEATURES_PER_WORKER = 2000
+# Above this many features the map viewer draws the layer as a datashader
+# raster instead of one matplotlib path per feature.
+_DATASHADER_MIN_FEATURES = 100_000
+
+# The numba kernels below are compiled for the explicit signatures in
+# _KERNEL_SIGNATURES by _compile_kernels, which the statistics worker runs,
+# so neither import nor the GUI thread waits on LLVM (a cold cache takes
+# seconds for the parallel kernel). Callers pass contiguous arrays of exactly
+# these dtypes. The kernels release the GIL, so the worker does not stall
+# the GUI thread.
+
+@njit(cache=True, nogil=True, fastmath=True)
+def _area_stats(a):
+    """Sum, mean, standard deviation, min and max of a non-empty float array in one pass."""
+    s = 0.0
+    s2 = 0.0
+    mn = a[0]
+    mx = a[0]
+    for i in range(a.shape[0]):
+        v = a[i]
+        s += v
+        s2 += v * v
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+    n = a.shape[0]
+    mean = s / n
+    var = max(s2 / n - mean * mean, 0.0)
+    return s, mean, math.sqrt(var), mn, mx
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def _shoelace_areas(coords, ring_offsets, poly_offsets, geom_offsets):
+    """
+    Planar area of each (Multi)Polygon given as ragged coordinate buffers:
+    the first ring of every polygon is its shell, the others are holes.
+    Vertices are taken relative to each ring's first one to keep precision
+    for large projected coordinates.
+    """
+    n = geom_offsets.shape[0] - 1
+    out = np.empty(n, np.float64)
+    for g in prange(n):
+        total = 0.0
+        for p in range(geom_offsets[g], geom_offsets[g + 1]):
+            for r in range(poly_offsets[p], poly_offsets[p + 1]):
+                start = ring_offsets[r]
+                x0 = coords[start, 0]
+                y0 = coords[start, 1]
+                a = 0.0
+                for i in range(start, ring_offsets[r + 1] - 1):
+                    a += ((coords[i, 0] - x0) * (coords[i + 1, 1] - y0)
+                          - (coords[i + 1, 0] - x0) * (coords[i, 1] - y0))
+                a = abs(a) * 0.5
+                if r == poly_offsets[p]:
+                    total += a
+                else:
+                    total -= a
+        out[g] = total
+    return out
+
+
+def _polygon_areas(geoms):
+    """Planar areas of an array of (Multi)Polygons, NaN where geometry is missing."""
+    import shapely
+    geom_type, coords, offsets = shapely.to_ragged_array(geoms, include_z=False)
+    if geom_type == shapely.GeometryType.MULTIPOLYGON:
+        ring_offsets, poly_offsets, geom_offsets = offsets
+    else:
+        ring_offsets, poly_offsets = offsets
+        geom_offsets = np.arange(len(poly_offsets))
+    areas = _shoelace_areas(np.ascontiguousarray(coords, dtype=np.float64),
+                            ring_offsets.astype(np.int64, copy=False),
+                            poly_offsets.astype(np.int64, copy=False),
+                            geom_offsets.astype(np.int64, copy=False))
+    areas[shapely.is_missing(geoms)] = np.nan
+    return areas
+
+
+# shapely.get_type_id codes; -1 (missing geometry) is left out.
+_GEOM_TYPE_NAMES = {
+    0: "Point", 1: "LineString", 2: "LinearRing", 3: "Polygon", 4: "MultiPoint",
+    5: "MultiLineString", 6: "MultiPolygon", 7: "GeometryCollection",
+}
+
+
+@njit(cache=True, nogil=True)
+def _type_histogram(codes):
+    """Count shapely type ids; bucket 0 is missing geometry (-1), bucket t + 1 is type t."""
+    h = np.zeros(9, np.int64)
+    for i in range(codes.shape[0]):
+        h[codes[i] + 1] += 1
+    return h
+
+
+_KERNEL_SIGNATURES = (
+    (_area_stats, "UniTuple(f8, 5)(f8[::1])"),
+    (_shoelace_areas, "f8[::1](f8[:, ::1], i8[::1], i8[::1], i8[::1])"),
+    (_type_histogram, "i8[::1](i4[::1])"),
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QAction
+
+
+if _HAVE_NUMBA:
+    # Start numba's thread pool on the main thread, which takes milliseconds.
+    # If compiling _shoelace_areas in the worker starts it instead, the TBB
+    # pool hangs the interpreter at exit.
+    get_num_threads()
+
+
+def _compile_kernels():
+    """Compile the numba kernels (or load them from the on-disk cache); a no-op once done."""
+    if not _HAVE_NUMBA:
+        return
+    for kernel, signature in _KERNEL_SIGNATURES:
+        if not kernel.signatures:
+            kernel.compile(signature)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_transformer(src_crs, target_epsg):
+    """
+    Build the pyproj Transformer for a CRS pair once and reuse it. Creating
+    one parses both definitions and sets up the PROJ pipeline, which costs
+    more than transforming a typical field layer.
+    """
+    from pyproj import Transformer
+    return Transformer.from_crs(src_crs, target_epsg, always_xy=True)
+
+
+def _reproject_parallel(gdf, target_epsg):
+    """
+    Reproject gdf to target_epsg, splitting the coordinate transform across
+    a thread pool. One pyproj Transformer is shared by all workers (pyproj
+    Transformers are thread-safe and release the GIL while transforming), and
+    each worker pushes its chunk's coordinates through it as one contiguous
+    array. Returns a new GeoDataFrame; attribute columns are untouched.
+    """
+    import geopandas as gpd
+    import shapely
+    transformer = _get_transformer(gdf.crs, target_epsg)
+
+    def transform_coords(xy):
+        x, y = transformer.transform(xy[:, 0], xy[:, 1])
+        return np.column_stack((x, y))
+
+    geoms = np.asarray(gdf.geometry.array)
+    workers = max(1, min(os.cpu_count() or 1, len(geoms) // _MIN_FEATURES_PER_WORKER))
+    if workers == 1:
+        reprojected = shapely.transform(geoms, transform_coords)
+    else:
+        chunks = np.array_split(geoms, workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(lambda chunk: shapely.transform(chunk, transform_coords), chunks)
+            reprojected = np.concatenate(list(parts))
+    return gdf.set_geometry(gpd.GeoSeries(reprojected, index=gdf.index, crs=target_epsg))
+
+
+def _polygon_paths(geoms):
+    """
+    Per-feature vertex and path-code arrays for an array of (Multi)Polygons,
+    cut from shapely's ragged coordinate buffers instead of walking every
+    ring object. Each feature becomes one compound path with a MOVETO at the
+    start and a CLOSEPOLY at the end of each of its rings.
+    """
+    import shapely
+    geom_type, coords, offsets = shapely.to_ragged_array(geoms, include_z=False)
+    ring_offsets = offsets[0]
+    if geom_type == shapely.GeometryType.MULTIPOLYGON:
+        feature_rings = offsets[1][offsets[2]]
+    else:
+        feature_rings = offsets[1]
+    codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+    codes[ring_offsets[:-1]] = Path.MOVETO
+    codes[ring_offsets[1:] - 1] = Path.CLOSEPOLY
+    bounds = ring_offsets[feature_rings][1:-1]
+    return np.split(coords, bounds), np.split(codes, bounds)
+
+
+@functools.lru_cache(maxsize=None)
+def _datashader():
+    """
+    (datashader, datashader.transfer_functions), or None if datashader is not
+    installed. It is optional: it rasterizes very large polygon layers far
+    faster than matplotlib can draw them as paths.
+    """
+    try:
+        import datashader as ds
+        import datashader.transfer_functions as tf
+    except ImportError:
+        return None
+    return ds, tf
+
+
+class _SpatialIndexBuilder(QThread):
+    """Build the STRtree of a GeoDataFrame's or GeoSeries' geometry away from the GUI thread."""
+    built = pyqtSignal(object)  # geopandas SpatialIndex
+
+    def __init__(self, gdf):
+        super().__init__()
+        self.gdf = gdf
+
+    def run(self):
+        import shapely
+        sindex = self.gdf.sindex
+        # GEOS packs the tree on its first query; do that here as well.
+        sindex.query(shapely.box(0, 0, 0, 0))
+        self.built.emit(sindex)
+
+
+##############################################################################
+# Basemap tiles: fetched on a worker thread and cached in-process.
+##############################################################################
+_BASEMAP_MAX_ZOOM = 19  # of Esri.WorldImagery, the basemap _fetch_basemap draws
+_WEB_MERCATOR_HALF_WORLD = 20037508.342789244  # metres from the origin to the edge
+
+
+def _basemap_zoom(xlim, ylim):
+    """Tile zoom level for an EPSG:3857 view: about two 256 px tiles across its longer side."""
+    span = max(xlim[1] - xlim[0], ylim[1] - ylim[0])
+    zoom = int(math.ceil(math.log2(4 * _WEB_MERCATOR_HALF_WORLD / span)))
+    return max(0, min(zoom, _BASEMAP_MAX_ZOOM))
+
+
+def _tile_aligned_bounds(xlim, ylim, zoom):
+    """Grow an EPSG:3857 view outward to whole tiles at zoom, so that nearby
+    views share the same bounds and hit the _fetch_basemap cache."""
+    size = 2 * _WEB_MERCATOR_HALF_WORLD / 2 ** zoom
+    inset = size * 1e-6  # keep exact tile edges from pulling in a neighbour
+    def snap(v, rounding):
+        return rounding((v + _WEB_MERCATOR_HALF_WORLD) / size) * size - _WEB_MERCATOR_HALF_WORLD
+    return (snap(xlim[0], math.floor) + inset, snap(ylim[0], math.floor) + inset,
+            snap(xlim[1], math.ceil) - inset, snap(ylim[1], math.ceil) - inset)
+
+
+@functools.lru_cache(maxsize=32)
+def _fetch_basemap(xmin, ymin, xmax, ymax, zoom):
+    """Download the tile mosaic for tile-aligned bounds; returns (image, extent)."""
+    import contextily as ctx
+    return ctx.bounds2img(xmin, ymin, xmax, ymax, zoom=zoom, source=ctx.providers.Esri.WorldImagery)
+
+
+# Worker threads still running; a QThread must stay referenced until it
+# finishes, even if the window that started it has been closed.
+_RUNNING_THREADS = set()
+
+
+class _TileFetcher(QThread):
+    """Fetch the basemap mosaic for tile-aligned EPSG:3857 bounds without blocking the GUI."""
+    tilesReady = pyqtSignal(int, object, object)  # request id, image, extent
+    fetchFailed = pyqtSignal(int)
+
+    def __init__(self, request_id, bounds, zoom):
+        super().__init__()
+        self.request_id = request_id
+        self.bounds = bounds
+        self.zoom = zoom
+
+    def run(self):
+        try:
+            img, extent = _fetch_basemap(*self.bounds, self.zoom)
+        except Exception as e:
+            print("Basemap could not be added:", e)
+            self.fetchFailed.emit(self.request_id)
+            return
+        if not self.isInterruptionRequested():
+            self.tilesReady.emit(self.request_id, img, tuple(extent))
+
+
+def _cast_cell(text, dtype):
+    """
+    Convert the text of an edited table cell to a value for a column of the
+    given dtype. Text that does not parse for a numeric or date column is
+    stored as missing, the same as saving always did.
+    """
+    import pandas as pd
+    if pd.api.types.is_bool_dtype(dtype):
+        return text.strip().lower() in ("true", "1")
+    if pd.api.types.is_numeric_dtype(dtype):
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.to_datetime(text, errors="coerce")
+    return text
+
+
+##############################################################################
+# Shapefile loading: read on a worker thread.
+##############################################################################
+class _ShapefileLoader(QThread):
+    """
+    Read a shapefile's attribute table without blocking the GUI. Geometry
+    is skipped here; MainWindow._ensure_geometry reads it the first time
+    the map, statistics or save need it.
+    """
+    loaded = pyqtSignal(object)  # DataFrame labelled by feature position
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, shp_path):
+        super().__init__()
+        self.shp_path = shp_path
+
+    def run(self):
+        try:
+            import pyogrio
+            attrs = pyogrio.read_dataframe(self.shp_path, read_geometry=False, use_arrow=True)
+        except Exception as e:
+            self.loadFailed.emit(str(e))
+            return
+        if not self.isInterruptionRequested():
+            self.loaded.emit(attrs)
+
+
+##############################################################################
+# Geometry statistics: computed on a worker thread.
+##############################################################################
+def _geometry_stats(geoms, crs, crs_is_projected, bounds=None):
+    """
+    Summary of an array of geometries for the statistics dialog, computed in
+    one go. crs_is_projected is crs.is_projected, worked out by the caller;
+    bounds is the known total_bounds of geoms, or None to compute it.
+    """
+    import shapely
+    codes = np.ascontiguousarray(shapely.get_type_id(geoms), dtype=np.int32)
+    if _HAVE_NUMBA:
+        type_counts = _type_histogram(codes)[1:]
+    else:
+        # Without numba the kernels are plain Python loops; numpy is faster.
+        type_counts = np.bincount(codes + 1, minlength=9)[1:]
+    stats = {
+        "n": len(geoms),
+        "bounds": shapely.total_bounds(geoms) if bounds is None else bounds,
+        "geom_types": {_GEOM_TYPE_NAMES[t]: int(n) for t, n in enumerate(type_counts) if n},
+        "total_area": None,
+        "avg_area": None,
+        "std_area": None,
+        "min_area": None,
+        "max_area": None,
+        "area_unit": "square units",
+    }
+    areas = None
+    if crs_is_projected:
+        if _HAVE_NUMBA and type_counts.any() and type_counts.sum() == type_counts[3] + type_counts[6]:
+            # Field-boundary layers: shoelace over the raw coordinate
+            # buffers, in parallel, without going through GEOS. As plain
+            # Python the kernel would be far slower than GEOS.
+            areas = _polygon_areas(geoms)
+        else:
+            # One vectorized GEOS pass for the areas.
+            areas = shapely.area(geoms)
+    elif crs and crs.is_geographic:
+        # Lon/lat layers (most field boundaries are WGS84) get their areas
+        # on the CRS ellipsoid instead of in square degrees.
+        from pyproj import Geod
+        geod = crs.get_geod() or Geod(ellps="WGS84")
+        areas = np.fromiter(
+            (abs(geod.geometry_area_perimeter(g)[0]) if g is not None else np.nan for g in geoms),
+            dtype=np.float64, count=len(geoms))
+        stats["area_unit"] = "square meters (geodesic)"
+    if areas is not None:
+        # One fused pass over the areas for every summary; rows without
+        # geometry are left out.
+        areas = np.ascontiguousarray(areas[~np.isnan(areas)], dtype=np.float64)
+        if len(areas) and _HAVE_NUMBA:
+            (stats["total_area"], stats["avg_area"], stats["std_area"],
+             stats["min_area"], stats["max_area"]) = _area_stats(areas)
+        elif len(areas):
+            (stats["total_area"], stats["avg_area"], stats["std_area"],
+             stats["min_area"], stats["max_area"]) = map(
+                float, (areas.sum(), areas.mean(), areas.std(), areas.min(), areas.max()))
+        else:
+            stats["total_area"] = 0.0
+    return stats
+
+
+class _StatsWorker(QThread):
+    """Run _geometry_stats without blocking the GUI."""
+    computed = pyqtSignal(object)  # dict from _geometry_stats
+    computeFailed = pyqtSignal(str)
+
+    def __init__(self, geoms, crs, crs_is_projected, bounds):
+        super().__init__()
+        self.geoms = geoms
+        self.crs = crs
+        self.crs_is_projected = crs_is_projected
+        self.bounds = bounds
+
+    def run(self):
+        try:
+            _compile_kernels()
+            stats = _geometry_stats(self.geoms, self.crs, self.crs_is_projected, self.bounds)
+        except Exception as e:
+            self.computeFailed.emit(str(e))
+            return
+        if not self.isInterruptionRequested():
+            self.computed.emit(stats)
 
 
 ##############################################################################
@@ -36,8 +463,24 @@ from PyQt6.QtGui import QAction
 # positioned on the left side. When navigating, the "base view" is updated so that
 # subsequent zooming is relative to the current view.
 ##############################################################################
+def _category_palette(cmap, n):
+    """
+    RGBA colors of n categories, used by every way the map draws a layer so a
+    category keeps its color. Categorical colormaps (fewer than 32 colors)
+    give category i their i-th color; continuous ones are stretched over the
+    categories, category i at cmap(i / (n - 1)). geopandas picks them the
+    same way.
+    """
+    colormap = plt.get_cmap(cmap)
+    if colormap.N < 32:
+        return colormap(np.arange(n))
+    return colormap(np.arange(n) / max(n - 1, 1))
+
+
 class MapDialog(QDialog):
     def __init__(self, gdf, parent=None):
+        import geopandas as gpd
+        import shapely
         super().__init__(parent)
         # Close stray figures so no extra "Figure 1" window appears.
         plt.close('all')
@@ -46,6 +489,17 @@ class MapDialog(QDialog):
         self.gdf = gdf
         self.current_alpha = 1.0  # Current transparency for the shapefile overlay.
 
+        # The source CRS never changes while the dialog is open, so reproject
+        # to Web Mercator once here; only the simplified copy made from it
+        # below is kept for redraws.
+        display_gdf = self.gdf
+        if self.gdf.crs is not None:
+            try:
+                if self.gdf.crs.to_epsg() != 3857:
+                    display_gdf = _reproject_parallel(self.gdf, 3857)
+            except Exception as e:
+                print("Error in reprojection:", e)
+
         main_layout = QVBoxLayout(self)
 
         # --- Top Controls for Coloring ---
@@ -125,7 +579,24 @@ class MapDialog(QDialog):
         self.zoom_slider.setValue(100)     # 100% is the base view.
         self.zoom_slider.setTickInterval(10)
         self.zoom_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.zoom_slider.valueChanged.connect(self.on_slider_zoom)
+        # Every tick only moves the axes limits (_zoom_preview). The basemap
+        # is refreshed once the zoom settles: on release of a drag, or 100 ms
+        # after the last keyboard/wheel/page step.
+        self.zoom_slider.valueChanged.connect(self._zoom_preview)
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(100)
+        self._zoom_timer.timeout.connect(self.on_slider_zoom_final)
+        # While the slider is dragged the scene is shown as a cached raster;
+        # the vector layers are redrawn once when it is released.
+        self.zoom_slider.sliderPressed.connect(self._begin_raster_zoom)
+        self.zoom_slider.sliderReleased.connect(self._end_raster_zoom)
+        # Any change of view (sliders, arrows, toolbar pan/zoom/home) ends in
+        # _on_view_settled once the limits have been still for 150 ms.
+        self._view_timer = QTimer(self)
+        self._view_timer.setSingleShot(True)
+        self._view_timer.setInterval(150)
+        self._view_timer.timeout.connect(self._on_view_settled)
         canvas_layout.addWidget(self.zoom_slider)
         map_layout.addLayout(canvas_layout)
 
@@ -141,39 +612,104 @@ class MapDialog(QDialog):
 
         main_layout.addLayout(map_layout)
 
+        # Matplotlib draws every vertex even when many fall inside one pixel.
+        # Snap the display copy to a grid of one screen pixel at the deepest
+        # slider zoom and Douglas-Peucker it at the same tolerance. Views
+        # zoomed in further than that (toolbar zoom, pans plus slider) are
+        # drawn from the full-resolution geometry kept in _full_geoms; see
+        # _wants_detail. The edited/saved data keeps its full precision.
+        self._display_simplified = display_gdf
+        self._full_geoms = np.asarray(display_gdf.geometry.array)
+        self._simplify_tol = None
+        xmin, _, xmax, _ = display_gdf.total_bounds
+        fig_width_px = self.fig.get_figwidth() * self.fig.dpi
+        px_tol = (xmax - xmin) / (fig_width_px * self.zoom_slider.maximum() / 100.0)
+        if np.isfinite(px_tol) and px_tol > 0:
+            self._simplify_tol = px_tol
+            snapped = shapely.set_precision(self._full_geoms, grid_size=px_tol, mode="pointwise")
+            self._display_simplified = display_gdf.copy()
+            self._display_simplified["geometry"] = gpd.GeoSeries(
+                snapped, index=display_gdf.index, crs=display_gdf.crs
+            ).simplify(tolerance=px_tol, preserve_topology=False)
+
+        # Background tile fetching; only the newest request may update the map.
+        self.basemap_im = None
+        self._tile_request_id = 0
+        self._tile_fetcher = None
+        # Tiles are fetched for the view padded by a quarter on every side;
+        # pans and small zooms that stay inside it need no new request.
+        self._basemap_envelope = None  # (xmin, ymin, xmax, ymax, zoom)
+
+        # Raster snapshot of the scene used while the zoom slider is dragged.
+        self._cache_rgba = None
+        self._cache_extent = None
+        self._cache_im = None
+        self._raster_hidden = []
+
+        # Everything but the shapefile layer, captured for blitting while the
+        # transparency slider moves. Any full draw makes it stale.
+        self._blit_bg = None
+        self._capturing_bg = False
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
+
+        # Very large layers are rasterized with datashader for the current
+        # view instead of being drawn as paths.
+        self._use_datashader = (len(self._display_simplified) > _DATASHADER_MIN_FEATURES
+                                and _datashader() is not None)
+        self._shaded_im = None
+        self._shaded_view = None  # (xlim, ylim) the raster was computed for
+
+        # State for recoloring the polygon layer in place (see update_map).
+        # The layer has one path per feature, skipping missing or empty
+        # geometries; _drawn_index maps each drawn path to its row.
+        self._poly_coll = None
+        self._colorbar = None
+        self._color_scale = None
+        self._layer_style = None  # (column, cmap) the layer is drawn with
+        self._layer_rows = None   # row positions currently plotted
+        self._layer_detail = False  # drawn from _full_geoms rather than the simplified copy
+        # Drawability comes from the full geometry: a small field simplified
+        # away to nothing still shows once the view is zoomed in on it.
+        missing = shapely.is_missing(self._full_geoms)
+        self._polygons_only = bool(np.isin(shapely.get_type_id(self._full_geoms[~missing]), (3, 6)).all())
+        self._drawable = ~(missing | shapely.is_empty(self._full_geoms))
+        self._drawn_index = np.flatnonzero(self._drawable)
+        geoms = np.asarray(self._display_simplified.geometry.array)
+
+        # Polygon layers are drawn from paths converted once up front, so
+        # redraws never go back through the shapely objects. A datashader
+        # layer never draws paths.
+        self._feature_verts = self._feature_codes = None
+        if self._polygons_only and self._drawable.any() and not self._use_datashader:
+            self._feature_verts, self._feature_codes = _polygon_paths(geoms[self._drawable])
+            self._path_slot = np.cumsum(self._drawable) - 1  # row -> path position
+
+        # Spatial index over the full geometry, so zoomed-in redraws only
+        # hand matplotlib the features inside the view. It is built in the
+        # background; until it is ready the whole layer is drawn. Datashader
+        # layers are rasterized for the view as a whole and need no index.
+        self._sindex = None
+        if not self._use_datashader:
+            builder = _SpatialIndexBuilder(gpd.GeoSeries(self._full_geoms, crs=display_gdf.crs))
+            builder.built.connect(self._on_sindex_built)
+            builder.finished.connect(lambda: _RUNNING_THREADS.discard(builder))
+            _RUNNING_THREADS.add(builder)
+            builder.start()
+
         self.plot_initial()
 
 
     def plot_initial(self):
-        self.ax.clear()
+        self._clear_axes()
         current_col = self.column_combo.currentText()
         cmap = self.cmap_combo.currentText()
     
         if self.gdf.crs is not None:
-            try:
-                if self.gdf.crs.to_epsg() != 3857:
-                    display_gdf = self.gdf.to_crs(epsg=3857)
-                else:
-                    display_gdf = self.gdf
-            except Exception as e:
-                print("Error in reprojection:", e)
-                display_gdf = self.gdf
+            self._plot_layer(current_col, cmap)
     
-            if current_col == "<No color column>":
-                display_gdf.plot(ax=self.ax, zorder=2, alpha=self.current_alpha)
-            else:
-                display_gdf.plot(column=current_col, cmap=cmap, legend=True,
-                                 ax=self.ax, zorder=2, alpha=self.current_alpha)
-    
-            try:
-                self.basemap_im = ctx.add_basemap(self.ax,
-                                                  source=ctx.providers.Esri.WorldImagery,
-                                                  zorder=1, attribution='', reset_extent=False)
-            except Exception as e:
-                print("Basemap could not be added:", e)
-                self.basemap_im = None
+            self._request_basemap()
         else:
-            self.gdf.plot(ax=self.ax, zorder=2, alpha=self.current_alpha)
+            self._plot_layer("<No color column>", cmap)
             self.basemap_im = None
     
         self.ax.set_title("Shapefile Geometry")
@@ -191,35 +727,20 @@ class MapDialog(QDialog):
         
 
     def update_map(self):
-        self.ax.clear()
         col = self.column_combo.currentText()
         cmap = self.cmap_combo.currentText()
+        # A new color column or colormap leaves the geometry untouched, so
+        # recolor the existing collection instead of rebuilding the scene.
+        if self._recolor_layer(col, cmap):
+            return
+        self._clear_axes()
     
         if self.gdf.crs is not None:
-            try:
-                if self.gdf.crs.to_epsg() != 3857:
-                    display_gdf = self.gdf.to_crs(epsg=3857)
-                else:
-                    display_gdf = self.gdf
-            except Exception as e:
-                print("Error in reprojection:", e)
-                display_gdf = self.gdf
+            self._plot_layer(col, cmap)
     
-            if col == "<No color column>":
-                display_gdf.plot(ax=self.ax, zorder=2, alpha=self.current_alpha)
-            else:
-                display_gdf.plot(column=col, cmap=cmap, legend=True,
-                                 ax=self.ax, zorder=2, alpha=self.current_alpha)
-    
-            try:
-                self.basemap_im = ctx.add_basemap(self.ax,
-                                                  source=ctx.providers.Esri.WorldImagery,
-                                                  zorder=1, attribution='', reset_extent=False)
-            except Exception as e:
-                print("Basemap could not be added:", e)
-                self.basemap_im = None
+            self._request_basemap()
         else:
-            self.gdf.plot(ax=self.ax, zorder=2, alpha=self.current_alpha)
+            self._plot_layer("<No color column>", cmap)
             self.basemap_im = None
     
         self.ax.set_title("Shapefile Geometry")
@@ -237,22 +758,279 @@ class MapDialog(QDialog):
         
         
 
+    def _clear_axes(self):
+        """Clear the map axes along with the colorbar of the previous layer."""
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+            self._color_scale = None
+        self._poly_coll = None
+        self.basemap_im = None
+        self._basemap_envelope = None
+        self._layer_rows = None
+        self._layer_detail = False
+        self._shaded_im = None
+        self._shaded_view = None
+        self.ax.clear()
+        # Clearing the axes also drops their callbacks.
+        self.ax.callbacks.connect("xlim_changed", self._on_view_changed)
+        self.ax.callbacks.connect("ylim_changed", self._on_view_changed)
+
+    def _wants_detail(self, xlim):
+        """
+        True if a screen pixel of a view spanning xlim is finer than the
+        simplification tolerance, so the layer must come from _full_geoms.
+        """
+        return (self._simplify_tol is not None
+                and (xlim[1] - xlim[0]) / max(self.ax.bbox.width, 1.0) < self._simplify_tol)
+
+    def _plot_layer(self, col, cmap, rows=None, detail=False):
+        """
+        Plot the shapefile layer (or only the features at positions rows)
+        onto self.ax and remember its collection. With detail the features
+        are drawn from the full-resolution geometry. Colors are normalized
+        over the whole column so a culled redraw matches the full one.
+        Numeric columns get a colorbar driven by self._color_scale, which
+        outlives any one collection so culling and _recolor_layer can keep
+        using it.
+        """
+        import geopandas as gpd
+        import pandas as pd
+        if self._use_datashader:
+            self._shade_layer(col, cmap)
+            return
+        display_gdf = self._display_simplified
+        if rows is None:
+            rows = np.arange(len(display_gdf))
+        self._drawn_index = rows[self._drawable[rows]]
+        continuous = col != "<No color column>" and self._is_continuous(col)
+        if self._feature_verts is not None:
+            self._plot_polygons(col, cmap, continuous, detail)
+        else:
+            subset = display_gdf.iloc[rows]
+            if detail:
+                subset = subset.copy()
+                subset[subset.geometry.name] = gpd.GeoSeries(
+                    self._full_geoms[rows], index=subset.index, crs=subset.crs)
+            style = dict(ax=self.ax, zorder=2, alpha=self.current_alpha)
+            if col == "<No color column>":
+                subset.plot(**style)
+            elif continuous:
+                values = display_gdf[col]
+                subset.plot(column=col, cmap=cmap, vmin=values.min(), vmax=values.max(), **style)
+            else:
+                # Colors are given per feature so they match _plot_polygons
+                # and _shade_layer; features with missing values are left out.
+                categories = pd.Categorical(display_gdf[col].dropna()).categories
+                palette = _category_palette(cmap, len(categories))
+                codes = pd.Categorical(subset[col], categories=categories).codes
+                if (codes >= 0).any():
+                    subset[codes >= 0].plot(color=palette[codes[codes >= 0]], **style)
+                if self.ax.get_legend() is None:
+                    self.ax.legend(handles=[Patch(color=palette[i], label=str(c))
+                                            for i, c in enumerate(categories)])
+        if continuous and self._colorbar is None:
+            values = display_gdf[col]
+            self._color_scale = ScalarMappable(norm=Normalize(values.min(), values.max()), cmap=cmap)
+            self._colorbar = self.fig.colorbar(self._color_scale, ax=self.ax)
+        self._layer_style = (col, cmap)
+        self._layer_rows = rows
+        self._layer_detail = detail
+
+    def _plot_polygons(self, col, cmap, continuous, detail=False):
+        """
+        Draw the polygons in self._drawn_index as one PolyCollection built
+        from the precomputed paths (or, with detail, from the full-resolution
+        geometry) and keep it as self._poly_coll. Missing values are left
+        transparent, as GeoDataFrame.plot leaves them out.
+        """
+        import pandas as pd
+        import shapely
+        coll = PolyCollection([], zorder=2, alpha=self.current_alpha)
+        if detail and len(self._drawn_index):
+            coll.set_verts_and_codes(*_polygon_paths(self._full_geoms[self._drawn_index]))
+        else:
+            slots = self._path_slot[self._drawn_index]
+            coll.set_verts_and_codes([self._feature_verts[i] for i in slots],
+                                     [self._feature_codes[i] for i in slots])
+        if col != "<No color column>":
+            values = self._display_simplified[col]
+            if continuous:
+                drawn = values.to_numpy(dtype=float, na_value=np.nan)[self._drawn_index]
+                coll.set_array(np.ma.masked_invalid(drawn))
+                coll.set_cmap(cmap)
+                coll.set_clim(values.min(), values.max())
+            else:
+                categories = pd.Categorical(values.dropna()).categories
+                palette = np.vstack([_category_palette(cmap, len(categories)), (0.0, 0.0, 0.0, 0.0)])
+                drawn = values.to_numpy()[self._drawn_index]
+                codes = pd.Categorical(drawn, categories=categories).codes  # -1 -> transparent
+                coll.set_facecolor(palette[codes])
+                if self.ax.get_legend() is None:
+                    self.ax.legend(handles=[Patch(color=palette[i], label=str(c))
+                                            for i, c in enumerate(categories)])
+        self.ax.add_collection(coll)
+        if len(self._drawn_index):
+            # Fields simplified away to nothing still count towards the extent.
+            xmin, ymin, xmax, ymax = shapely.total_bounds(self._full_geoms[self._drawn_index])
+            self.ax.update_datalim([(xmin, ymin), (xmax, ymax)])
+        self.ax.autoscale_view()
+        crs = self._display_simplified.crs
+        if crs is not None and crs.is_geographic:
+            ymin, ymax = self._display_simplified.total_bounds[[1, 3]]
+            self.ax.set_aspect(1 / np.cos(np.radians((ymin + ymax) / 2)))
+        else:
+            self.ax.set_aspect("equal")
+        self._poly_coll = coll
+
+    def _shade_layer(self, col, cmap):
+        """
+        Rasterize the layer with datashader at the pixel size of the map axes
+        for the current view and show it as one image at the layer's zorder.
+        Views finer than the simplification tolerance use the full geometry.
+        """
+        import geopandas as gpd
+        import pandas as pd
+        ds, tf = _datashader()
+        display_gdf = self._display_simplified
+        if self._shaded_view is None:
+            # First draw on cleared axes: start from the full layer extent.
+            xmin, ymin, xmax, ymax = display_gdf.total_bounds
+            self.ax.set_aspect("equal")
+            self.ax.set_xlim(xmin, xmax)
+            self.ax.set_ylim(ymin, ymax)
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        if self._wants_detail(xlim):
+            display_gdf = display_gdf.copy()
+            display_gdf[display_gdf.geometry.name] = gpd.GeoSeries(
+                self._full_geoms, index=display_gdf.index, crs=display_gdf.crs)
+        cvs = ds.Canvas(plot_width=max(int(self.ax.bbox.width), 1),
+                        plot_height=max(int(self.ax.bbox.height), 1),
+                        x_range=xlim, y_range=ylim)
+        geometry = display_gdf.geometry.name
+        if col == "<No color column>":
+            agg = cvs.polygons(display_gdf, geometry=geometry, agg=ds.count())
+            img = tf.shade(agg, cmap=["steelblue", "steelblue"])
+        elif self._is_continuous(col):
+            values = display_gdf[col]
+            agg = cvs.polygons(display_gdf, geometry=geometry, agg=ds.mean(col))
+            img = tf.shade(agg, cmap=plt.get_cmap(cmap), how="linear",
+                           span=(values.min(), values.max()))
+            if self._colorbar is None:
+                self._color_scale = ScalarMappable(norm=Normalize(values.min(), values.max()), cmap=cmap)
+                self._colorbar = self.fig.colorbar(self._color_scale, ax=self.ax)
+        else:
+            # Same categories as the other drawing paths; features with a
+            # missing value are left out instead of forming a "nan" class.
+            values = display_gdf[col]
+            categories = pd.Categorical(values.dropna()).categories
+            codes = pd.Categorical(values, categories=categories).codes
+            frame = display_gdf.loc[codes >= 0, [col, geometry]].copy()
+            categories = [str(c) for c in categories]
+            frame[col] = pd.Categorical.from_codes(codes[codes >= 0], categories=categories)
+            colors = {c: to_hex(rgba) for c, rgba in zip(categories, _category_palette(cmap, len(categories)))}
+            agg = cvs.polygons(frame, geometry=geometry, agg=ds.count_cat(col))
+            img = tf.shade(agg, color_key=colors)
+            if self.ax.get_legend() is None:
+                self.ax.legend(handles=[Patch(color=colors[c], label=c) for c in categories])
+
+        # Row 0 of the aggregate is the bottom of the view.
+        rgba = img.data.view(np.uint8).reshape(*img.shape, 4)
+        if self._shaded_im is not None:
+            self._shaded_im.remove()
+        self._shaded_im = self.ax.imshow(rgba, extent=(*xlim, *ylim), origin="lower",
+                                         zorder=2, alpha=self.current_alpha)
+        # imshow autoscales to the image; keep the current view.
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        self._shaded_view = (xlim, ylim)
+        self._layer_style = (col, cmap)
+
+    def _cull_layer(self):
+        """
+        Redraw the shapefile layer with only the features that intersect the
+        current view. Matplotlib would otherwise transform every vertex of
+        the layer just to clip most of them away. Views zoomed in past the
+        simplification tolerance are drawn from the full geometry.
+        """
+        if self._layer_style is None:
+            return
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        if self._use_datashader:
+            # The raster is only valid for the view it was computed for.
+            if self._shaded_view != (xlim, ylim):
+                self._shade_layer(*self._layer_style)
+                self.canvas.draw_idle()
+            return
+        if self._sindex is None:
+            return
+        import shapely
+        view = shapely.box(xlim[0], ylim[0], xlim[1], ylim[1])
+        rows = np.sort(self._sindex.query(view, predicate="intersects"))
+        detail = self._wants_detail(xlim)
+        if np.array_equal(rows, self._layer_rows) and detail == self._layer_detail:
+            return
+        for coll in [c for c in self.ax.collections if c.get_zorder() == 2]:
+            coll.remove()
+        self._poly_coll = None
+        self._plot_layer(*self._layer_style, rows=rows, detail=detail)
+        # GeoDataFrame.plot autoscales the axes; keep the user's view.
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        self.canvas.draw_idle()
+
+    def _on_sindex_built(self, sindex):
+        self._sindex = sindex
+        if self._cache_im is None:
+            self._cull_layer()
+
+    def _on_view_changed(self, _ax):
+        self._view_timer.start()
+
+    def _on_view_settled(self):
+        """Cull the layer and top up the basemap once the view stops moving."""
+        if self._cache_im is not None:
+            return  # mid-drag; _end_raster_zoom redraws on release
+        self._cull_layer()
+        self._request_basemap()
+
+    def _is_continuous(self, col):
+        """True if col is drawn with a continuous colormap rather than categories."""
+        import pandas as pd
+        values = self._display_simplified[col]
+        return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+    def _recolor_layer(self, col, cmap):
+        """
+        Recolor the current polygon layer by col/cmap without clearing the
+        axes, re-plotting or re-adding the basemap. Returns False when that
+        is not possible and the caller has to rebuild the scene.
+        """
+        if self._poly_coll is None or self._colorbar is None:
+            return False
+        if col == "<No color column>" or not self._is_continuous(col):
+            return False
+        values = self._display_simplified[col]
+        drawn = values.to_numpy(dtype=float, na_value=np.nan)[self._drawn_index]
+        if len(drawn) != len(self._poly_coll.get_paths()):
+            return False
+        self._poly_coll.set_array(np.ma.masked_invalid(drawn))
+        self._poly_coll.set_cmap(cmap)
+        self._poly_coll.set_clim(values.min(), values.max())
+        # The colorbar follows its ScalarMappable.
+        self._color_scale.set_cmap(cmap)
+        self._color_scale.set_clim(values.min(), values.max())
+        self._layer_style = (col, cmap)
+        self.canvas.draw_idle()
+        return True
+
     def reset_view(self):
         """Reset the view to the original base view and remove axis labels."""
         self.ax.set_xlim(self.original_xlim)
         self.ax.set_ylim(self.original_ylim)
         self.zoom_slider.setValue(100)
     
-        if self.basemap_im is not None:
-            self.basemap_im.set_extent((self.original_xlim[0], self.original_xlim[1],
-                                        self.original_ylim[0], self.original_ylim[1]))
-        else:
-            try:
-                self.basemap_im = ctx.add_basemap(self.ax,
-                                                  source=ctx.providers.Esri.WorldImagery,
-                                                  zorder=1, attribution='', reset_extent=False)
-            except Exception as e:
-                print("Basemap re-add failed:", e)
+        self._request_basemap()
     
         # REMOVE AXES LABELS PERMANENTLY
         self.ax.set_xticks([])  # Remove x-axis ticks
@@ -261,32 +1039,42 @@ class MapDialog(QDialog):
         self.canvas.draw_idle()
 
 
-    def on_slider_zoom(self, value):
+    def _zoom_limits(self, value):
         """
-        Adjust the view limits based on the zoom slider value.
+        Compute the view limits for a zoom slider value.
         The slider value (as a percentage) defines a scale factor relative to the current base view.
         """
         scale = value / 100.0  # 1.0 = current base; >1.0 = zoom in; <1.0 = zoom out.
         x_center = (self.original_xlim[0] + self.original_xlim[1]) / 2
         y_center = (self.original_ylim[0] + self.original_ylim[1]) / 2
         half_width = (self.original_xlim[1] - self.original_xlim[0]) / 2
-        half_height = (self.original_ylim[1] - self.original_ylim[1] + self.original_ylim[0]) / 2 if False else (self.original_ylim[1] - self.original_ylim[0]) / 2  # keep original logic
+        half_height = (self.original_ylim[1] - self.original_ylim[0]) / 2
     
         new_xlim = [x_center - half_width / scale, x_center + half_width / scale]
         new_ylim = [y_center - half_height / scale, y_center + half_height / scale]
-    
+        return new_xlim, new_ylim
+
+    def _zoom_preview(self, value):
+        """
+        Cheap per-tick zoom: only move the axes limits. The basemap is left
+        to on_slider_zoom_final once the slider settles.
+        """
+        new_xlim, new_ylim = self._zoom_limits(value)
+        self.ax.set_xlim(new_xlim)
+        self.ax.set_ylim(new_ylim)
+        self.canvas.draw_idle()
+        # Drags finish on sliderReleased; other steps are coalesced here.
+        if not self.zoom_slider.isSliderDown():
+            self._zoom_timer.start()
+
+    def on_slider_zoom_final(self):
+        """Bring the basemap in line with the settled zoom slider view."""
+        self._zoom_timer.stop()
+        new_xlim, new_ylim = self._zoom_limits(self.zoom_slider.value())
         self.ax.set_xlim(new_xlim)
         self.ax.set_ylim(new_ylim)
     
-        if self.basemap_im is not None:
-            self.basemap_im.set_extent((new_xlim[0], new_xlim[1], new_ylim[0], new_ylim[1]))
-        else:
-            try:
-                self.basemap_im = ctx.add_basemap(self.ax,
-                                                  source=ctx.providers.Esri.WorldImagery,
-                                                  zorder=1, attribution='', reset_extent=False)
-            except Exception as e:
-                print("Basemap update failed:", e)
+        self._request_basemap()
     
         # REMOVE AXES LABELS PERMANENTLY
         self.ax.set_xticks([])  # Remove x-axis ticks
@@ -295,17 +1083,134 @@ class MapDialog(QDialog):
         self.canvas.draw_idle()
 
 
+    def _request_basemap(self):
+        """
+        Fetch basemap tiles for the current view on a worker thread. The
+        basemap already on screen stays until the new tiles arrive, and
+        results for views that have since changed are dropped. Nothing is
+        fetched while the view stays inside the padded envelope of the last
+        request at the same tile zoom.
+        """
+        if self.gdf.crs is None:
+            return
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        zoom = _basemap_zoom(xlim, ylim)
+        env = self._basemap_envelope
+        if (env is not None and env[4] == zoom and env[0] <= xlim[0] and xlim[1] <= env[2]
+                and env[1] <= ylim[0] and ylim[1] <= env[3]):
+            return
+        pad_x = (xlim[1] - xlim[0]) * 0.25
+        pad_y = (ylim[1] - ylim[0]) * 0.25
+        bounds = _tile_aligned_bounds((xlim[0] - pad_x, xlim[1] + pad_x),
+                                      (ylim[0] - pad_y, ylim[1] + pad_y), zoom)
+        self._basemap_envelope = (*bounds, zoom)
+
+        if self._tile_fetcher is not None:
+            self._tile_fetcher.requestInterruption()
+        self._tile_request_id += 1
+        fetcher = _TileFetcher(self._tile_request_id, bounds, zoom)
+        fetcher.tilesReady.connect(self._on_tiles_ready)
+        fetcher.fetchFailed.connect(self._on_tiles_failed)
+        fetcher.finished.connect(lambda: _RUNNING_THREADS.discard(fetcher))
+        _RUNNING_THREADS.add(fetcher)
+        self._tile_fetcher = fetcher
+        fetcher.start()
+
+    def _on_tiles_ready(self, request_id, img, extent):
+        """Swap freshly fetched tiles into the basemap image."""
+        if request_id != self._tile_request_id:
+            return
+        self._tile_fetcher = None
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        if self.basemap_im is None:
+            self.basemap_im = self.ax.imshow(img, extent=extent, zorder=1, interpolation="bilinear")
+        else:
+            self.basemap_im.set_data(img)
+            self.basemap_im.set_extent(extent)
+        # Placing the image autoscales the axes; keep the user's view.
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        self.canvas.draw_idle()
+
+    def _on_tiles_failed(self, request_id):
+        """Forget the envelope of a failed fetch so the next view change retries."""
+        if request_id == self._tile_request_id:
+            self._tile_fetcher = None
+            self._basemap_envelope = None
+
+    def _begin_raster_zoom(self):
+        """
+        Snapshot the last rendered frame of the map axes and show it in place
+        of the basemap and shapefile layers, so each slider tick only has to
+        rescale one image instead of re-transforming every polygon path.
+        """
+        buf = np.asarray(self.canvas.buffer_rgba())
+        x0, y0, x1, y1 = np.round(self.ax.bbox.extents).astype(int)
+        height = buf.shape[0]
+        self._cache_rgba = buf[height - y1:height - y0, x0:x1].copy()
+        self._cache_extent = (*self.ax.get_xlim(), *self.ax.get_ylim())
+
+        self._raster_hidden = [a for a in (*self.ax.collections, *self.ax.images) if a.get_visible()]
+        for artist in self._raster_hidden:
+            artist.set_visible(False)
+        self._cache_im = self.ax.imshow(self._cache_rgba, extent=self._cache_extent,
+                                        aspect=self.ax.get_aspect(), zorder=3)
+        # imshow autoscales to the image; keep the current view.
+        self.ax.set_xlim(self._cache_extent[:2])
+        self.ax.set_ylim(self._cache_extent[2:])
+
+    def _end_raster_zoom(self):
+        """Drop the raster snapshot and redraw the vector scene at the final zoom."""
+        if self._cache_im is None:
+            return
+        self._cache_im.remove()
+        self._cache_im = None
+        self._cache_rgba = None
+        for artist in self._raster_hidden:
+            artist.set_visible(True)
+        self._raster_hidden = []
+        self.on_slider_zoom_final()
+
     def on_slider_transparency(self, value):
         """
         Update the transparency of the shapefile overlay.
         A value of 100 means fully opaque.
+        Only the overlay is redrawn: it is blitted over a cached image of
+        the rest of the map instead of re-rendering the basemap each tick.
         """
         new_alpha = value / 100.0
         self.current_alpha = new_alpha
-        for coll in self.ax.collections:
-            if coll.get_zorder() == 2:
-                coll.set_alpha(new_alpha)
-        self.canvas.draw_idle()
+        layers = [c for c in self.ax.collections if c.get_zorder() == 2]
+        if self._shaded_im is not None:
+            layers.append(self._shaded_im)
+        for layer in layers:
+            layer.set_alpha(new_alpha)
+        if not layers or not self.canvas.supports_blit:
+            self.canvas.draw_idle()
+            return
+
+        if self._blit_bg is None:
+            for layer in layers:
+                layer.set_visible(False)
+            self._capturing_bg = True
+            try:
+                self.canvas.draw()
+            finally:
+                self._capturing_bg = False
+                for layer in layers:
+                    layer.set_visible(True)
+            self._blit_bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.canvas.restore_region(self._blit_bg)
+        for layer in layers:
+            self.ax.draw_artist(layer)
+        # The legend sits above the layer and has to be drawn over it again.
+        if self.ax.get_legend() is not None:
+            self.ax.draw_artist(self.ax.get_legend())
+        self.canvas.blit(self.ax.bbox)
+
+    def _on_canvas_draw(self, _event):
+        if not self._capturing_bg:
+            self._blit_bg = None
 
     # --- Navigation Buttons Handler ---
     def move_map(self, dx_frac, dy_frac):
@@ -332,9 +1237,8 @@ class MapDialog(QDialog):
         self.ax.set_xlim(new_xlim)
         self.ax.set_ylim(new_ylim)
         
-        # Update the basemap's extent to match the new view limits
-        if self.basemap_im is not None:
-            self.basemap_im.set_extent((new_xlim[0], new_xlim[1], new_ylim[0], new_ylim[1]))
+        # Fetch tiles for the newly exposed area
+        self._request_basemap()
         
         # Redraw the canvas to reflect the changes
         self.canvas.draw_idle()
@@ -421,9 +1325,149 @@ class MassUpdateDialog(QDialog):
         return self.value
 
 
+##############################################################################
+# GdfTableModel: the attribute table, read from the GeoDataFrame on demand.
+##############################################################################
+class GdfTableModel(QAbstractTableModel):
+    """
+    Table model over the attribute columns of a GeoDataFrame. Cells are
+    formatted only when the view paints them, so nothing is stored per
+    cell, and edits are written straight back into the frame.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frame = None
+        self.columns = []
+
+    def set_frame(self, gdf):
+        """Show gdf, replacing whatever the model held."""
+        self.beginResetModel()
+        self.frame = gdf
+        self.columns = [c for c in gdf.columns if c != "geometry"] if gdf is not None else []
+        self._positions = [gdf.columns.get_loc(c) for c in self.columns] if gdf is not None else []
+        # Labels for added rows only ever count up, so they never reuse the
+        # feature position of a deleted row.
+        self._next_label = int(gdf.index.max()) + 1 if gdf is not None and len(gdf) else 0
+        self.endResetModel()
+
+    def attach_geometry(self, gdf):
+        """
+        Swap in gdf, the current frame with a geometry column added. Rows and
+        attribute columns are unchanged, so the view keeps its selection.
+        """
+        self.frame = gdf
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.frame is None:
+            return 0
+        return len(self.frame)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        return str(self.frame.iat[index.row(), self._positions[index.column()]])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """Write an edited cell back into the frame."""
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        import pandas as pd
+        col_name = self.columns[index.column()]
+        col = self.frame[col_name]
+        value = _cast_cell(value, col.dtype)
+        if pd.api.types.is_integer_dtype(col) and (value is None or not float(value).is_integer()):
+            # Fractional or missing values turn an integer field into a real one.
+            self.frame[col_name] = col.astype(float)
+        self.frame.iat[index.row(), self._positions[index.column()]] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def column_changed(self, column):
+        """Tell the view that every cell of column was rewritten."""
+        self.dataChanged.emit(self.index(0, column), self.index(self.rowCount() - 1, column))
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Reorder the frame itself by column, so view row N is always frame row N."""
+        if self.frame is None or column >= len(self.columns):
+            return
+        col_name = self.columns[column]
+        ascending = order == Qt.SortOrder.AscendingOrder
+        self.layoutAboutToBeChanged.emit()
+        # The selection and current cell follow their feature to its new row.
+        persistent = self.persistentIndexList()
+        labels = [self.frame.index[index.row()] for index in persistent]
+        try:
+            self.frame.sort_values(col_name, ascending=ascending, kind="stable", inplace=True)
+        except TypeError:
+            # Mixed value types in one column; fall back to comparing text.
+            self.frame.sort_values(col_name, ascending=ascending, kind="stable", inplace=True,
+                                   key=lambda values: values.astype(str))
+        rows = self.frame.index.get_indexer(labels)
+        self.changePersistentIndexList(
+            persistent, [self.index(row, index.column()) for row, index in zip(rows, persistent)])
+        self.layoutChanged.emit()
+
+    def append_row(self):
+        """Add a feature with no geometry and missing attribute values."""
+        import pandas as pd
+        row = self.rowCount()
+        label = self._next_label
+        self._next_label += 1
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.frame = self.frame.reindex(self.frame.index.append(pd.Index([label])))
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.frame = self.frame.drop(self.frame.index[row])
+        self.endRemoveRows()
+
+    def append_column(self, col_name, value):
+        """Add col_name filled with value as the last column."""
+        column = len(self.columns)
+        self.beginInsertColumns(QModelIndex(), column, column)
+        self.frame[col_name] = value
+        self.columns.append(col_name)
+        self._positions.append(self.frame.columns.get_loc(col_name))
+        self.endInsertColumns()
+
+    def remove_column(self, column):
+        self.beginRemoveColumns(QModelIndex(), column, column)
+        self.frame = self.frame.drop(columns=self.columns[column])
+        del self.columns[column]
+        self._positions = [self.frame.columns.get_loc(c) for c in self.columns]
+        self.endRemoveColumns()
+
+
 ##############################################################################
 # MainWindow: Enhanced UI for editing/viewing shapefiles.
 ##############################################################################
+_ABOUT_TEXT = (
+    "Shapefile (DBF) Editor - Demo version\n"
+    "Developed for agronomists\n\n"
+    "Features:\n"
+    " - View and edit shapefile attributes\n"
+    " - Mass update attribute values\n"
+    " - Interactive map viewer with slider-based zoom/pan, a real-world basemap, "
+    "transparency control, and navigation arrows\n"
+    " - Filter table rows\n\n"
+    "Version 1.0"
+)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -477,9 +1521,15 @@ class MainWindow(QMainWindow):
         self.main_layout.addLayout(filter_layout)
         # --- End Filter Section ---
 
-        # Table widget
-        self.tableWidget = QTableWidget()
-        self.main_layout.addWidget(self.tableWidget)
+        # Table view. The GeoDataFrame in table_model is the source of truth:
+        # cells are read from it on demand, edits are written straight back,
+        # and sorting reorders the frame itself.
+        self.table_model = GdfTableModel(self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.table_model)
+        self.tableView.horizontalHeader().sectionClicked.connect(self._sort_by_column)
+        self.apply_table_theme()
+        self.main_layout.addWidget(self.tableView)
 
         # First row of buttons
         buttons_layout = QHBoxLayout()
@@ -512,31 +1562,62 @@ class MainWindow(QMainWindow):
 
         # Internal references.
         self.shapefile_path = None
-        self.gdf = None
-        self.attr_columns = []
+        self._sort_column = None
+        self._sort_ascending = True
+        # Per-row visibility last applied to the table, so filtering only
+        # has to touch rows whose state flips.
+        self._last_mask = np.ones(0, dtype=bool)
+        # The newest shapefile load; older ones still running are kept
+        # referenced in _RUNNING_THREADS until their threads finish.
+        self._loader = None
+        # Geometry statistics of self.gdf, computed on a worker thread when
+        # first shown and dropped whenever features are added or removed.
+        self._stats_cache = None
+        self._stats_worker = None
+        # The statistics rendered as HTML for the reusable statistics dialog;
+        # rebuilt only when the statistics or the column count change.
+        self._stats_html = None
+        self._stats_dialog = None
+        self._stats_doc = None  # the QTextDocument shown in _stats_dialog
+        # total_bounds of self.gdf, kept apart from the statistics because
+        # most edits cannot change it.
+        self._total_bounds = None
+        # self.gdf.crs.is_projected, looked up once when the geometry is read;
+        # edits never reproject self.gdf.
+        self._crs_is_projected = False
+
+    @property
+    def gdf(self):
+        return self.table_model.frame
+
+    @property
+    def attr_columns(self):
+        return self.table_model.columns
 
     def apply_table_theme(self):
         # behavior
-        self.tableWidget.setAlternatingRowColors(True)
-        self.tableWidget.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.tableWidget.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.tableWidget.setSortingEnabled(True)
-        self.tableWidget.setWordWrap(False)
-        self.tableWidget.setShowGrid(True)
+        self.tableView.setAlternatingRowColors(True)
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tableView.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tableView.setSortingEnabled(False)  # sorting is done on self.gdf
+        self.tableView.setWordWrap(False)
+        self.tableView.setShowGrid(True)
 
         # sizing
-        vh = self.tableWidget.verticalHeader()
-        hh = self.tableWidget.horizontalHeader()
+        vh = self.tableView.verticalHeader()
+        hh = self.tableView.horizontalHeader()
         vh.setDefaultSectionSize(28)
         vh.setVisible(False)  # cleaner look; toggle True if you want row numbers
         hh.setDefaultAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
         hh.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)  # user-resizable
         hh.setStretchLastSection(True)  # last column fills remaining space
-        self.tableWidget.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        hh.setSectionsClickable(True)
+        hh.setSortIndicatorShown(True)
+        self.tableView.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
 
         # dark-friendly stylesheet with padding and clear selection
-        self.tableWidget.setStyleSheet("""
-            QTableWidget {
+        self.tableView.setStyleSheet("""
+            QTableView {
                 /* works in dark & light */
                 gridline-color: #444;
                 alternate-background-color: #2b2b2b;
@@ -545,7 +1626,7 @@ class MainWindow(QMainWindow):
                 selection-background-color: #3a6ea5;
                 selection-color: #ffffff;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;              /* extra breathing room */
             }
             QHeaderView::section {
@@ -569,18 +1650,31 @@ class MainWindow(QMainWindow):
         if col_text in ["--", ""]:
             QMessageBox.warning(self, "Filter Error", "Please select a valid column to filter.")
             return
-        filter_text = self.filterLineEdit.text().lower()
-        col_index = self.filterColumnCombo.currentIndex()
-        for row in range(self.tableWidget.rowCount()):
-            item = self.tableWidget.item(row, col_index)
-            if item is not None:
-                cell_text = item.text().lower()
-                self.tableWidget.setRowHidden(row, filter_text not in cell_text)
+        filter_text = self.filterLineEdit.text()
+        if not filter_text:
+            # Every cell contains the empty string.
+            self._apply_row_mask(np.ones(self.table_model.rowCount(), dtype=bool))
+            return
+        # Match on the GeoDataFrame column in one vectorized, case-insensitive
+        # pass rather than reading every table cell back. Missing values are
+        # matched as the text the table shows for them ("None", "nan", ...).
+        col = self.gdf[col_text]
+        text = col.astype("string")
+        missing = col.isna().to_numpy()
+        if missing.any():
+            text[missing] = col[missing].map(str)
+        mask = text.str.contains(filter_text, case=False, regex=False).to_numpy(dtype=bool)
+        self._apply_row_mask(mask)
 
     def clear_filter(self):
         self.filterLineEdit.clear()
-        for row in range(self.tableWidget.rowCount()):
-            self.tableWidget.setRowHidden(row, False)
+        self._apply_row_mask(np.ones(self.table_model.rowCount(), dtype=bool))
+
+    def _apply_row_mask(self, mask):
+        """Show the rows where mask is True, touching only rows that change."""
+        for row in np.flatnonzero(mask != self._last_mask):
+            self.tableView.setRowHidden(row, not mask[row])
+        self._last_mask = mask
 
     def open_shapefile(self):
         file_dialog = QFileDialog()
@@ -589,89 +1683,136 @@ class MainWindow(QMainWindow):
             self.load_shapefile(file_path)
 
     def load_shapefile(self, shp_path):
-        try:
-            gdf = gpd.read_file(shp_path)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to open Shapefile:\n{str(e)}")
-            return
-        self.shapefile_path = shp_path
-        self.gdf = gdf
-        self.attr_columns = [c for c in self.gdf.columns if c != "geometry"]
+        """Read shp_path on a worker thread behind a progress dialog."""
+        if self._loader is not None:
+            self._loader.requestInterruption()
+        # The read reports no progress of its own, so show a busy indicator.
+        progress = QProgressDialog("Loading shapefile...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Open Shapefile")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        loader = _ShapefileLoader(shp_path)
+        self._loader = loader
+        loader.loaded.connect(lambda gdf: self._on_shapefile_loaded(loader, gdf))
+        loader.loadFailed.connect(lambda message: self._on_shapefile_failed(loader, message))
+        # reset() hides the busy dialog; close() would report a cancel.
+        loader.finished.connect(progress.reset)
+        loader.finished.connect(progress.deleteLater)
+        loader.finished.connect(lambda: _RUNNING_THREADS.discard(loader))
+        _RUNNING_THREADS.add(loader)
+        progress.canceled.connect(loader.requestInterruption)
+        loader.start()
+
+    def _on_shapefile_loaded(self, loader, gdf):
+        if loader is not self._loader:
+            return  # superseded by a newer load
+        self._loader = None
+        self.shapefile_path = loader.shp_path
+        self._sort_column = None
+        self._sort_ascending = True
+        self._stats_cache = None
+        self._stats_worker = None  # a result still to come is for the old file
+        self._total_bounds = None
+        self._crs_is_projected = False  # known once _ensure_geometry reads the geometry
+        # Hidden rows outlive a model reset; show them all before switching frames.
+        self._apply_row_mask(np.ones(len(self._last_mask), dtype=bool))
+        self.table_model.set_frame(gdf)
         self.populate_table()
 
+    def _on_shapefile_failed(self, loader, message):
+        if loader is not self._loader:
+            return
+        self._loader = None
+        QMessageBox.critical(self, "Error", f"Failed to open Shapefile:\n{message}")
+
     def populate_table(self):
-        if self.gdf is None or len(self.attr_columns) == 0:
-            self.tableWidget.setRowCount(0)
-            self.tableWidget.setColumnCount(0)
-            return
-        df_attrs = self.gdf[self.attr_columns].copy()
-        num_rows = len(df_attrs)
-        num_cols = len(df_attrs.columns)
-        self.tableWidget.clear()
-        self.tableWidget.setRowCount(num_rows)
-        self.tableWidget.setColumnCount(num_cols)
-        self.tableWidget.setHorizontalHeaderLabels(df_attrs.columns.tolist())
-        for row_idx in range(num_rows):
-            for col_idx in range(num_cols):
-                val = df_attrs.iat[row_idx, col_idx]
-                item = QTableWidgetItem(str(val))
-                # PyQt6: use Qt.ItemFlag.ItemIsEditable
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-                self.tableWidget.setItem(row_idx, col_idx, item)
-        self.apply_table_theme()
+        """
+        Set up the table view for the frame just put in table_model. The
+        model formats cells as they are painted, so there is nothing to fill.
+        """
+        self._last_mask = np.ones(self.table_model.rowCount(), dtype=bool)
+        self.tableView.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self.filterColumnCombo.clear()
         self.filterColumnCombo.addItems(self.attr_columns)
 
         # one-time auto size (reasonable width cap)
-        self.tableWidget.resizeColumnsToContents()
-        for col in range(self.tableWidget.columnCount()):
-            w = self.tableWidget.columnWidth(col)
-            self.tableWidget.setColumnWidth(col, min(max(w, 120), 320))
+        self.tableView.resizeColumnsToContents()
+        for col in range(self.table_model.columnCount()):
+            w = self.tableView.columnWidth(col)
+            self.tableView.setColumnWidth(col, min(max(w, 120), 320))
+
+    def _sort_by_column(self, col_index):
+        """Sort self.gdf by the clicked column, toggling the direction on repeat clicks."""
+        if self.gdf is None or col_index >= len(self.attr_columns):
+            return
+        col_name = self.attr_columns[col_index]
+        ascending = not (self._sort_column == col_name and self._sort_ascending)
+        hidden_labels = self.gdf.index[~self._last_mask]
+        order = Qt.SortOrder.AscendingOrder if ascending else Qt.SortOrder.DescendingOrder
+        self.table_model.sort(col_index, order)
+        self._sort_column = col_name
+        self._sort_ascending = ascending
+        # Hidden rows move with their features on a layout change; only the
+        # record of them needs reordering.
+        self._last_mask = ~self.gdf.index.isin(hidden_labels)
+        self.tableView.horizontalHeader().setSortIndicator(col_index, order)
 
     def add_column(self):
         col_name, ok = QInputDialog.getText(self, "New Column", "Enter column name:")
         if not ok or not col_name:
             return
+        if self.gdf is None:
+            QMessageBox.warning(self, "No Data", "No shapefile data loaded.")
+            return
+        if col_name in self.gdf.columns:
+            QMessageBox.warning(self, "New Column", f"Column '{col_name}' already exists.")
+            return
         default_value, ok2 = QInputDialog.getText(self, "Default Value", "Enter default value for new column:")
         if not ok2:
             return
-        col_index = self.tableWidget.columnCount()
-        self.tableWidget.insertColumn(col_index)
-        self.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(col_name))
-        row_count = self.tableWidget.rowCount()
-        for row in range(row_count):
-            item = QTableWidgetItem(default_value)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.tableWidget.setItem(row, col_index, item)
-        self.attr_columns.append(col_name)
-        self.apply_table_theme()
+        # One column insert for the view: the existing columns keep their
+        # widths and the scroll position stays put.
+        self.table_model.append_column(col_name, default_value)
+        self._stats_html = None  # the column count is part of it
         self.filterColumnCombo.clear()
         self.filterColumnCombo.addItems(self.attr_columns)
 
     def delete_column(self):
-        col_index = self.tableWidget.currentColumn()
+        col_index = self.tableView.currentIndex().column()
         if col_index < 0:
             QMessageBox.warning(self, "Delete Column", "No column selected.")
             return
-        self.tableWidget.removeColumn(col_index)
-        if col_index < len(self.attr_columns):
-            self.attr_columns.pop(col_index)
-        self.apply_table_theme()
+        self.table_model.remove_column(col_index)
+        self._stats_html = None
         self.filterColumnCombo.clear()
         self.filterColumnCombo.addItems(self.attr_columns)
 
     def add_row(self):
-        row_count = self.tableWidget.rowCount()
-        self.tableWidget.insertRow(row_count)
-        self.apply_table_theme()
+        if self.gdf is None:
+            QMessageBox.warning(self, "No Data", "No shapefile data loaded.")
+            return
+        self.table_model.append_row()
+        self._last_mask = np.append(self._last_mask, True)
+        self._stats_cache = None  # the new row has no geometry, so bounds stay
 
     def delete_row(self):
-        row_index = self.tableWidget.currentRow()
+        row_index = self.tableView.currentIndex().row()
         if row_index < 0:
             QMessageBox.warning(self, "Delete Row", "No row selected.")
             return
-        self.tableWidget.removeRow(row_index)
-        self.apply_table_theme()
+        if self._total_bounds is not None:
+            # Geometry has been read (the bounds came from it). The bounds
+            # can only shrink if the removed feature touched them.
+            import shapely
+            xmin, ymin, xmax, ymax = shapely.bounds(self.gdf.geometry.array[row_index])
+            bxmin, bymin, bxmax, bymax = self._total_bounds
+            if not (xmin > bxmin and ymin > bymin and xmax < bxmax and ymax < bymax):
+                if not np.isnan(xmin):  # features without geometry never count
+                    self._total_bounds = None
+        self.table_model.remove_row(row_index)
+        self._last_mask = np.delete(self._last_mask, row_index)
+        self._stats_cache = None
 
     def mass_update(self):
         if self.gdf is None or not len(self.attr_columns):
@@ -679,122 +1820,201 @@ class MainWindow(QMainWindow):
             return
         dialog = MassUpdateDialog(self.attr_columns, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
+            import pandas as pd
             selected_columns = dialog.getSelectedColumns()
             operation = dialog.getOperation()
             value = dialog.getValue()
+            if operation == "divide" and value == 0:
+                QMessageBox.warning(self, "Error", "Cannot divide by zero.")
+                return
+            # Do the arithmetic on self.gdf as one pandas operation per column;
+            # the table view re-reads the cells it shows. Values that are not
+            # numbers are left as they are.
             for col_idx, col_name in enumerate(self.attr_columns):
-                if col_name in selected_columns:
-                    for row in range(self.tableWidget.rowCount()):
-                        item = self.tableWidget.item(row, col_idx)
-                        if item is not None:
-                            try:
-                                old_val = float(item.text())
-                                if operation == "add":
-                                    new_val = old_val + value
-                                elif operation == "subtract":
-                                    new_val = old_val - value
-                                elif operation == "multiply":
-                                    new_val = old_val * value
-                                elif operation == "divide":
-                                    if value == 0:
-                                        QMessageBox.warning(self, "Error", "Cannot divide by zero.")
-                                        return
-                                    new_val = old_val / value
-                                else:
-                                    new_val = old_val
-                                item.setText(str(new_val))
-                            except ValueError:
-                                pass
+                col = self.gdf[col_name]
+                if (col_name not in selected_columns or pd.api.types.is_bool_dtype(col)
+                        or pd.api.types.is_datetime64_any_dtype(col)):
+                    continue
+                old_vals = pd.to_numeric(col, errors="coerce")
+                if operation == "add":
+                    new_vals = old_vals + value
+                elif operation == "subtract":
+                    new_vals = old_vals - value
+                elif operation == "multiply":
+                    new_vals = old_vals * value
+                elif operation == "divide":
+                    new_vals = old_vals / value
+                else:
+                    new_vals = old_vals
+                parsed = old_vals.notna().to_numpy()
+                if pd.api.types.is_numeric_dtype(col):
+                    self.gdf[col_name] = new_vals.astype(float)
+                else:
+                    # Text columns holding numbers stay text columns.
+                    self.gdf[col_name] = col.where(~parsed, new_vals.map(str))
+                self.table_model.column_changed(col_idx)
             QMessageBox.information(self, "Success", "Mass update operation applied.")
 
+    def _ensure_geometry(self):
+        """
+        Attach the shapefile geometry to self.gdf the first time it is
+        needed; opening a file only reads the attribute table. Returns False
+        if the geometry could not be read.
+        """
+        import geopandas as gpd
+        if isinstance(self.gdf, gpd.GeoDataFrame):
+            return True
+        try:
+            import pyogrio
+            shapes = pyogrio.read_dataframe(self.shapefile_path, columns=[], use_arrow=True)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to read shapefile geometry:\n{str(e)}")
+            return False
+        # Rows are labelled by their feature position in the file, so sorted
+        # and deleted rows still line up; added rows get no geometry.
+        geometry = shapes.geometry.reindex(self.gdf.index)
+        self.table_model.attach_geometry(gpd.GeoDataFrame(self.gdf, geometry=geometry))
+        self._crs_is_projected = bool(self.gdf.crs and self.gdf.crs.is_projected)
+        return True
+
     def save_shapefile(self):
         if self.gdf is None:
             QMessageBox.warning(self, "No Shapefile Loaded", "Please open a shapefile first.")
             return
+        if not self._ensure_geometry():
+            return
         save_path, _ = QFileDialog.getSaveFileName(
             self, "Save Shapefile As", self.shapefile_path, "Shapefiles (*.shp)"
         )
         if not save_path:
             return
-        records = []
-        for row_idx in range(self.tableWidget.rowCount()):
-            row_data = {}
-            for col_idx, col_name in enumerate(self.attr_columns):
-                item = self.tableWidget.item(row_idx, col_idx)
-                val_str = item.text() if item else ""
-                if col_name in self.gdf.columns and pd.api.types.is_numeric_dtype(self.gdf[col_name]):
-                    try:
-                        val = float(val_str)
-                    except ValueError:
-                        val = None
-                else:
-                    val = val_str
-                row_data[col_name] = val
-            records.append(row_data)
-        updated_df = pd.DataFrame(records, columns=self.attr_columns)
-        if "geometry" in self.gdf.columns:
-            geom = self.gdf["geometry"]
-        else:
-            QMessageBox.critical(self, "Error", "No geometry found in the GeoDataFrame.")
-            return
-        new_gdf = gpd.GeoDataFrame(updated_df, geometry=geom, crs=self.gdf.crs)
         try:
-            new_gdf.to_file(save_path, driver="ESRI Shapefile")
+            self.gdf.to_file(save_path, driver="ESRI Shapefile", engine="pyogrio")
             QMessageBox.information(self, "Success", f"Shapefile saved successfully:\n{save_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save shapefile:\n{str(e)}")
-        self.gdf = new_gdf
 
     def view_map(self):
         if self.gdf is None:
             QMessageBox.warning(self, "No Shapefile Loaded", "Please open a shapefile first.")
             return
+        if not self._ensure_geometry():
+            return
         try:
             dlg = MapDialog(self.gdf, parent=self)
             dlg.exec()
+            # The dialog holds its own display copies, paths and index.
+            dlg.deleteLater()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to plot shapefile:\n{str(e)}")
 
-    def show_statistics(self):
-        if self.gdf is None:
-            QMessageBox.information(self, "Statistics", "No shapefile loaded.")
-            return
-        num_features = len(self.gdf)
-        bounds = self.gdf.total_bounds
+    def _build_stats_html(self):
+        """Render self._stats_cache as the HTML shown by show_statistics."""
+        cached = self._stats_cache
+        bounds = cached["bounds"]
         stats = [
-            f"Number of features: {num_features}",
+            f"Number of features: {cached['n']}",
             "Bounds:",
             f"  MinX: {bounds[0]:.2f}, MinY: {bounds[1]:.2f}",
             f"  MaxX: {bounds[2]:.2f}, MaxY: {bounds[3]:.2f}",
             f"Coordinate Reference System: {self.gdf.crs if self.gdf.crs else 'None'}",
-            f"Geometry types: {', '.join(self.gdf.geom_type.unique())}",
+            "Geometry types: " + ", ".join(f"{name} ({n})" for name, n in cached["geom_types"].items()),
             f"Number of attribute columns: {len(self.attr_columns)}"
         ]
-        if self.gdf.crs and self.gdf.crs.is_projected:
-            total_area = self.gdf.area.sum()
-            avg_area = self.gdf.area.mean()
-            stats.append(f"Total area: {total_area:.2f} square units")
-            stats.append(f"Average area per feature: {avg_area:.2f} square units")
+        unit = cached["area_unit"]
+        if cached["total_area"] is not None:
+            if cached["avg_area"] is None:
+                stats.append(f"Total area: {cached['total_area']:.2f} {unit}")
+            else:
+                # Format all area figures with one vectorized call.
+                total, avg, std, smallest, largest = np.char.mod("%.2f", np.array(
+                    [cached[k] for k in ("total_area", "avg_area", "std_area", "min_area", "max_area")]))
+                stats.append(f"Total area: {total} {unit}")
+                stats.append(f"Average area per feature: {avg} {unit}")
+                stats.append(f"Std. dev. of feature area: {std} {unit}")
+                stats.append(f"Smallest / largest feature: {smallest} / {largest} {unit}")
+        elif self.gdf.crs is None:
+            stats.append(
+                "Note: The shapefile has no coordinate reference system, "
+                "so feature areas cannot be calculated."
+            )
         else:
             stats.append(
-                "Note: The shapefile is not in a projected coordinate system. "
-                "Coordinates are likely in degrees, so area calculations may not be accurate."
+                "Note: The coordinate reference system is neither projected nor "
+                "geographic, so feature areas cannot be calculated."
             )
-        QMessageBox.information(self, "Shapefile Statistics", "\n".join(stats))
+        return "<br>".join(html.escape(line).replace("  ", "&nbsp;&nbsp;") for line in stats)
+
+    def show_statistics(self):
+        if self.gdf is None:
+            QMessageBox.information(self, "Statistics", "No shapefile loaded.")
+            return
+        if not self._ensure_geometry():
+            return
+        if self._stats_cache is not None:
+            self._show_stats_dialog()
+            return
+        if self._stats_worker is not None:
+            return  # already computing; the dialog opens when it is done
+        # Areas of a large layer take a while; work them out on a thread
+        # behind a busy indicator and open the dialog with the result.
+        progress = QProgressDialog("Computing statistics...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Shapefile Statistics")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        worker = _StatsWorker(np.asarray(self.gdf.geometry.array), self.gdf.crs,
+                              self._crs_is_projected, self._total_bounds)
+        self._stats_worker = worker
+        worker.computed.connect(lambda stats: self._on_stats_computed(worker, progress, stats))
+        worker.computeFailed.connect(lambda message: self._on_stats_failed(worker, progress, message))
+        worker.finished.connect(progress.deleteLater)
+        worker.finished.connect(lambda: _RUNNING_THREADS.discard(worker))
+        _RUNNING_THREADS.add(worker)
+        progress.canceled.connect(worker.requestInterruption)
+        progress.canceled.connect(lambda: self._on_stats_failed(worker, progress, None))
+        worker.start()
+
+    def _on_stats_computed(self, worker, progress, stats):
+        progress.reset()
+        if worker is not self._stats_worker:
+            return  # cancelled, or a different shapefile has been loaded
+        self._stats_worker = None
+        self._total_bounds = stats["bounds"]
+        self._stats_cache = stats
+        self._stats_html = None
+        self._show_stats_dialog()
+
+    def _on_stats_failed(self, worker, progress, message):
+        """Forget worker; message is None when the user cancelled it."""
+        progress.reset()
+        if worker is not self._stats_worker:
+            return
+        self._stats_worker = None
+        if message is not None:
+            QMessageBox.critical(self, "Error", f"Failed to compute statistics:\n{message}")
+
+    def _show_stats_dialog(self):
+        """Show self._stats_cache in the reusable statistics dialog."""
+        if self._stats_dialog is None:
+            self._stats_dialog = QDialog(self)
+            self._stats_dialog.setWindowTitle("Shapefile Statistics")
+            self._stats_dialog.resize(480, 360)
+            layout = QVBoxLayout(self._stats_dialog)
+            self._stats_doc = QTextDocument(self._stats_dialog)
+            view = QTextBrowser()
+            view.setDocument(self._stats_doc)
+            layout.addWidget(view)
+            buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
+            buttons.accepted.connect(self._stats_dialog.accept)
+            layout.addWidget(buttons)
+        if self._stats_html is None:
+            self._stats_html = self._build_stats_html()
+            self._stats_doc.setHtml(self._stats_html)
+        self._stats_dialog.exec()
 
     def show_about(self):
-        about_text = (
-            "Shapefile (DBF) Editor - Demo version\n"
-            "Developed for agronomists\n\n"
-            "Features:\n"
-            " - View and edit shapefile attributes\n"
-            " - Mass update attribute values\n"
-            " - Interactive map viewer with slider-based zoom/pan, a real-world basemap, "
-            "transparency control, and navigation arrows\n"
-            " - Filter table rows\n\n"
-            "Version 1.0"
-        )
-        QMessageBox.information(self, "About", about_text)
+        QMessageBox.information(self, "About", _ABOUT_TEXT)
 
 
 def main():
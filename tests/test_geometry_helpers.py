@@ -0,0 +1,146 @@
+"""Checks of the numba and ragged-array geometry helpers against shapely."""
+
+import importlib.util
+import os
+import sys
+import tempfile
+
+# Keep the kernels compiled here apart from the app's own numba cache: the
+# cache records the module name, which is __main__ when the app runs.
+os.environ.setdefault("NUMBA_CACHE_DIR", tempfile.mkdtemp(prefix="numba-tests-"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+import shapely
+from matplotlib.path import Path
+from pyproj import CRS
+from shapely.geometry import MultiPolygon, Polygon, box
+
+_APP = os.path.join(os.path.dirname(__file__), os.pardir, "Shape File Editor.py")
+_spec = importlib.util.spec_from_file_location("shape_file_editor", _APP)
+editor = importlib.util.module_from_spec(_spec)
+# numba's cache looks the module up by name when it loads a kernel.
+sys.modules["shape_file_editor"] = editor
+_spec.loader.exec_module(editor)
+
+
+def _holed(x, y, size, hole):
+    return Polygon(box(x, y, x + size, y + size).exterior.coords,
+                   [box(x + 1, y + 1, x + 1 + hole, y + 1 + hole).exterior.coords])
+
+
+POLYGONS = np.array([
+    box(0, 0, 2, 3),
+    _holed(10, 10, 5, 2),
+    # Open-field coordinates in metres, where precision matters.
+    _holed(500_000, 4_600_000, 250, 40),
+    Polygon(),
+    None,
+], dtype=object)
+
+MIXED = np.array([
+    box(0, 0, 2, 3),
+    MultiPolygon([_holed(0, 0, 6, 3), box(20, 20, 21, 24)]),
+    MultiPolygon([box(500_000, 4_600_000, 500_010, 4_600_010),
+                  _holed(500_100, 4_600_100, 30, 5)]),
+    Polygon(),
+    None,
+], dtype=object)
+
+
+@pytest.mark.parametrize("geoms", [POLYGONS, MIXED], ids=["polygons", "multipolygons"])
+def test_polygon_areas_match_shapely(geoms):
+    areas = editor._polygon_areas(geoms)
+    expected = shapely.area(geoms)
+    assert np.isnan(areas[-1])  # missing geometry
+    assert areas[-2] == 0.0     # empty geometry
+    np.testing.assert_allclose(areas[:-1], expected[:-1], rtol=1e-12)
+
+
+def test_polygon_areas_ignore_z():
+    geoms = np.array([Polygon([(0, 0, 5), (4, 0, 5), (4, 1, 5), (0, 1, 5)])], dtype=object)
+    np.testing.assert_allclose(editor._polygon_areas(geoms), [4.0])
+
+
+def test_type_histogram_matches_get_type_id():
+    geoms = np.concatenate([MIXED, [shapely.Point(0, 0), shapely.LineString([(0, 0), (1, 1)])]])
+    codes = np.ascontiguousarray(shapely.get_type_id(geoms), dtype=np.int32)
+    counts = editor._type_histogram(codes)
+    np.testing.assert_array_equal(counts, np.bincount(codes + 1, minlength=9))
+
+
+def test_area_stats_match_numpy():
+    a = np.random.default_rng(0).uniform(1.0, 5_000.0, 1_000)
+    total, mean, std, smallest, largest = editor._area_stats(a)
+    np.testing.assert_allclose([total, mean, std, smallest, largest],
+                               [a.sum(), a.mean(), a.std(), a.min(), a.max()], rtol=1e-9)
+
+
+def test_polygon_paths_one_compound_path_per_feature():
+    geoms = MIXED[:3]
+    verts, codes = editor._polygon_paths(geoms)
+    assert len(verts) == len(codes) == len(geoms)
+    for geom, v, c in zip(geoms, verts, codes):
+        parts = getattr(geom, "geoms", [geom])
+        rings = [r for p in parts for r in (p.exterior, *p.interiors)]
+        np.testing.assert_array_equal(v, np.concatenate([np.asarray(r.coords) for r in rings]))
+        assert (c == Path.MOVETO).sum() == (c == Path.CLOSEPOLY).sum() == len(rings)
+        assert c[0] == Path.MOVETO and c[-1] == Path.CLOSEPOLY
+
+
+PROJECTED = CRS.from_epsg(32615)
+GEOGRAPHIC = CRS.from_epsg(4326)
+
+
+def _summaries(stats):
+    return [stats[k] for k in ("total_area", "avg_area", "std_area", "min_area", "max_area")]
+
+
+@pytest.mark.parametrize("have_numba", [True, False], ids=["numba", "no-numba"])
+@pytest.mark.parametrize("geoms", [POLYGONS, MIXED], ids=["polygons", "multipolygons"])
+def test_geometry_stats_projected(monkeypatch, geoms, have_numba):
+    if not have_numba:
+        monkeypatch.setattr(editor, "_HAVE_NUMBA", False)
+        # Without numba the shoelace kernel is plain Python and must not run.
+        monkeypatch.setattr(editor, "_polygon_areas", lambda geoms: pytest.fail("kernel used"))
+    stats = editor._geometry_stats(geoms, PROJECTED, True)
+    areas = shapely.area(geoms)
+    areas = areas[~np.isnan(areas)]
+    assert stats["n"] == len(geoms)
+    assert stats["area_unit"] == "square units"
+    np.testing.assert_array_equal(stats["bounds"], shapely.total_bounds(geoms))
+    np.testing.assert_allclose(_summaries(stats),
+                               [areas.sum(), areas.mean(), areas.std(), areas.min(), areas.max()],
+                               rtol=1e-9)
+    types = shapely.get_type_id(geoms)
+    assert stats["geom_types"] == {editor._GEOM_TYPE_NAMES[t]: int((types == t).sum())
+                                   for t in np.unique(types[types >= 0])}
+
+
+def test_geometry_stats_geographic_uses_geodesic_areas():
+    geoms = np.array([box(-93.0, 42.0, -92.99, 42.01), None], dtype=object)
+    stats = editor._geometry_stats(geoms, GEOGRAPHIC, False)
+    expected = abs(GEOGRAPHIC.get_geod().geometry_area_perimeter(geoms[0])[0])
+    assert stats["area_unit"] == "square meters (geodesic)"
+    np.testing.assert_allclose(stats["total_area"], expected, rtol=1e-12)
+    assert 500_000 < stats["total_area"] < 1_000_000  # about 0.9 km x 1.1 km
+
+
+def test_geometry_stats_without_crs_has_no_areas():
+    stats = editor._geometry_stats(POLYGONS, None, False)
+    assert _summaries(stats) == [None] * 5
+    assert stats["area_unit"] == "square units"
+
+
+def test_geometry_stats_all_missing():
+    geoms = np.array([None, None], dtype=object)
+    stats = editor._geometry_stats(geoms, PROJECTED, True)
+    assert stats["total_area"] == 0.0
+    assert _summaries(stats)[1:] == [None] * 4
+    assert stats["geom_types"] == {}
+
+
+def test_geometry_stats_keeps_passed_bounds():
+    bounds = np.array([-1.0, -2.0, 3.0, 4.0])
+    assert editor._geometry_stats(POLYGONS, PROJECTED, True, bounds=bounds)["bounds"] is bounds